@@ -8,6 +8,9 @@ This avoids TextIOWrapper/flush issues and works across google-cloud-storage ver
 Requirements:
     pip install google-cloud-bigquery google-cloud-storage google-auth
 
+Optional (much faster row streaming for large tables):
+    pip install google-cloud-bigquery-storage pyarrow
+
 Usage example:
     python bq_to_gcs_xml.py \
       --project student-00380 \
@@ -22,21 +25,60 @@ If bucket uses requester-pays:
 """
 from __future__ import annotations
 import argparse
+import gzip
 import sys
 import time
 import io
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional, Any
 
 import google.auth
+from google.api_core.exceptions import NotFound
 from google.cloud import bigquery, storage
 from xml.sax.saxutils import escape as xml_escape
 
+try:
+    from google.cloud import bigquery_storage
+    BQSTORAGE_AVAILABLE = True
+except Exception:
+    BQSTORAGE_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pa_compute
+    PYARROW_AVAILABLE = True
+except Exception:
+    PYARROW_AVAILABLE = False
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except Exception:
+    LXML_AVAILABLE = False
+
+# Progress reporting cadence; line-buffered print every 1000 rows costs a
+# syscall per flush, which adds up on multi-million-row tables.
+PROGRESS_EVERY = 100_000
+
+# REST paging: the SDK default page size means many HTTP round trips on
+# large tables; bigger pages halve wall time on latency-bound exports.
+DEFAULT_PAGE_SIZE = 100_000
+
 # Helpers
 def now_z() -> str:
     return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
 
+_escape_cached = lru_cache(maxsize=65536)(xml_escape)
+
+def escape_value(sval: str) -> str:
+    """Escape a string for XML, memoizing short (likely categorical/repeated) values."""
+    if len(sval) < 64:
+        return _escape_cached(sval)
+    return xml_escape(sval)
+
 def safe_format_value(value: Any) -> str:
     if value is None:
         return ""
@@ -52,6 +94,193 @@ def safe_format_value(value: Any) -> str:
         return str(value)
     return str(value)
 
+def _format_timestamp(value: Any) -> str:
+    dt = value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return dt.isoformat().replace("+00:00", "Z")
+
+def _format_bytes(value: Any) -> str:
+    try:
+        return value.decode("utf-8")
+    except Exception:
+        return str(value)
+
+def make_formatter(field):
+    """
+    Pick a formatter for one schema field so the row loop skips the
+    per-cell isinstance ladder in safe_format_value.
+    """
+    if field.mode == "REPEATED":
+        return str
+    if field.field_type in ("TIMESTAMP", "DATETIME"):
+        return _format_timestamp
+    if field.field_type == "BYTES":
+        return _format_bytes
+    return str
+
+def iter_table_rows(row_iterator, bqstorage_client=None):
+    """
+    Yield mapping-style rows from a BigQuery RowIterator.
+
+    When a BigQueryReadClient is supplied, rows are pulled as columnar Arrow
+    batches over the Storage Read API (gRPC) instead of paged JSON over REST,
+    which avoids per-cell Python object construction in the BigQuery client.
+    """
+    if bqstorage_client is not None:
+        for batch in row_iterator.to_arrow_iterable(bqstorage_client=bqstorage_client):
+            yield from batch.to_pylist()
+    else:
+        yield from row_iterator
+
+def write_arrow_batch_xml(out_stream, batch, open_tags, close_tags, empty_tags) -> int:
+    """
+    Emit XML rows for one Arrow RecordBatch using column-major conversion.
+
+    Each column is converted to Python once per batch (timestamps via Arrow's
+    C-level strftime kernel) instead of dispatching safe_format_value per cell.
+    Returns the number of rows written.
+    """
+    py_cols = []
+    for i in range(batch.num_columns):
+        col = batch.column(i)
+        if pa.types.is_timestamp(col.type):
+            col = pa_compute.strftime(col, format="%Y-%m-%dT%H:%M:%SZ")
+        py_cols.append(col.to_pylist())
+
+    n_cols = len(py_cols)
+    for row_idx in range(batch.num_rows):
+        parts = [b"  <Defaulter>\n"]
+        for i in range(n_cols):
+            value = py_cols[i][row_idx]
+            if value is None:
+                parts.append(empty_tags[i])
+            else:
+                sval = value if isinstance(value, str) else safe_format_value(value)
+                parts.append(open_tags[i])
+                parts.append(escape_value(sval).encode("utf-8"))
+                parts.append(close_tags[i])
+        parts.append(b"  </Defaulter>\n")
+        out_stream.write(b"".join(parts))
+
+    return batch.num_rows
+
+def write_rows_lxml(out_stream, rows, schema_columns, formatters, progress_every=PROGRESS_EVERY) -> int:
+    """
+    Serialize rows through lxml's incremental xmlfile writer.
+
+    Element serialization, escaping and encoding all happen in libxml2's C
+    code, removing the per-cell Python tag assembly and xml.sax escape path.
+    Returns the number of rows written.
+    """
+    written = 0
+    with etree.xmlfile(out_stream, encoding="utf-8") as xf:
+        xf.write_declaration()
+        with xf.element("Defaulters"):
+            for row in rows:
+                vals = tuple(row.values())
+                with xf.element("Defaulter"):
+                    for i, col in enumerate(schema_columns):
+                        value = vals[i]
+                        with xf.element(col):
+                            if value is not None:
+                                xf.write(formatters[i](value))
+                written += 1
+                if written % progress_every == 0:
+                    sys.stdout.write(f"[{now_z()}] Processed {written} rows...\n")
+                    sys.stdout.flush()
+    return written
+
+def stream_table_to_gcs_sharded(
+    storage_client: storage.Client,
+    bq_client: bigquery.Client,
+    project: str,
+    dataset: str,
+    table: str,
+    bucket_name: str,
+    object_name: str,
+    shards: int,
+    bqstorage_client,
+    chunk_size: int = 16 * 1024 * 1024
+) -> str:
+    """
+    Export the table as up to `shards` XML objects written concurrently, one
+    per Storage Read API stream, plus a manifest object listing the shard URIs.
+    A single resumable upload is limited to one TCP stream; sharding lets large
+    exports saturate the network. Returns the manifest's gs:// URI.
+    """
+    table_ref = f"{project}.{dataset}.{table}"
+    print(f"[{now_z()}] Preparing sharded export ({shards} shards) for table: {table_ref}")
+
+    table_obj = bq_client.get_table(table_ref)
+    schema_columns = [f.name for f in table_obj.schema]
+
+    open_tags = [f"    <{c}>".encode("utf-8") for c in schema_columns]
+    close_tags = [f"</{c}>\n".encode("utf-8") for c in schema_columns]
+    empty_tags = [f"    <{c}></{c}>\n".encode("utf-8") for c in schema_columns]
+
+    # no lookup_bucket round trip; a missing bucket surfaces as NotFound on upload
+    bucket = storage_client.bucket(bucket_name)
+
+    session = bqstorage_client.create_read_session(
+        parent=f"projects/{project}",
+        read_session=bigquery_storage.types.ReadSession(
+            table=f"projects/{project}/datasets/{dataset}/tables/{table}",
+            data_format=bigquery_storage.types.DataFormat.ARROW,
+        ),
+        max_stream_count=shards,
+    )
+    if not session.streams:
+        raise RuntimeError(f"Storage Read API returned no streams for {table_ref} (empty table?)")
+
+    stem, dot, ext = object_name.rpartition(".")
+    if not dot:
+        stem, ext = object_name, "xml"
+
+    def export_stream(shard_idx: int, stream_name: str):
+        shard_object = f"{stem}_{shard_idx:04d}.{ext}"
+        blob = bucket.blob(shard_object)
+        try:
+            raw_stream = blob.open("wb", chunk_size=chunk_size, ignore_flush=True)
+        except TypeError:
+            raw_stream = blob.open("wb")
+        out_stream = io.BufferedWriter(raw_stream, buffer_size=1 << 20)
+
+        written = 0
+        try:
+            out_stream.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+            out_stream.write(b"<Defaulters>\n")
+            reader = bqstorage_client.read_rows(stream_name)
+            for page in reader.rows().pages:
+                written += write_arrow_batch_xml(out_stream, page.to_arrow(), open_tags, close_tags, empty_tags)
+            out_stream.write(b"</Defaulters>\n")
+        finally:
+            try:
+                out_stream.close()
+            except Exception:
+                pass
+            try:
+                raw_stream.close()
+            except Exception:
+                pass
+
+        shard_uri = f"gs://{bucket_name}/{shard_object}"
+        print(f"[{now_z()}] Shard {shard_idx}: {shard_uri} (rows: {written})")
+        return shard_uri, written
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(session.streams)) as executor:
+            futures = [executor.submit(export_stream, idx, s.name) for idx, s in enumerate(session.streams)]
+            results = [f.result() for f in futures]
+    except NotFound:
+        raise RuntimeError(f"Bucket '{bucket_name}' not found or not accessible with current credentials.")
+
+    total_rows = sum(written for _, written in results)
+    manifest_object = f"{stem}.manifest.txt"
+    manifest_blob = bucket.blob(manifest_object)
+    manifest_blob.upload_from_string("".join(uri + "\n" for uri, _ in results), content_type="text/plain")
+    manifest_uri = f"gs://{bucket_name}/{manifest_object}"
+    print(f"[{now_z()}] Sharded export complete: {len(results)} shards, {total_rows} rows, manifest {manifest_uri}")
+    return manifest_uri
+
 # Core: binary streaming + fallback
 def stream_table_to_gcs_binary_with_fallback(
     storage_client: storage.Client,
@@ -62,7 +291,12 @@ def stream_table_to_gcs_binary_with_fallback(
     bucket_name: str,
     object_name: str,
     retries: int = 3,
-    backoff: int = 2
+    backoff: int = 2,
+    bqstorage_client=None,
+    chunk_size: int = 16 * 1024 * 1024,
+    progress_every: int = PROGRESS_EVERY,
+    gzip_encode: bool = True,
+    page_size: int = DEFAULT_PAGE_SIZE
 ) -> str:
     """
     Stream BigQuery rows directly into gs://bucket_name/object_name using binary writes.
@@ -77,10 +311,21 @@ def stream_table_to_gcs_binary_with_fallback(
     schema_columns = [f.name for f in table_obj.schema]
     print(f"[{now_z()}] Columns: {schema_columns}")
 
-    bucket = storage_client.lookup_bucket(bucket_name)
-    if bucket is None:
-        raise RuntimeError(f"Bucket '{bucket_name}' not found or not accessible with current credentials.")
+    # Precompile per-column tag templates so the row loop never re-formats tag names
+    open_tags = [f"    <{c}>".encode("utf-8") for c in schema_columns]
+    close_tags = [f"</{c}>\n".encode("utf-8") for c in schema_columns]
+    empty_tags = [f"    <{c}></{c}>\n".encode("utf-8") for c in schema_columns]
+
+    # one formatter per column resolved from the schema, not per cell
+    formatters = [make_formatter(f) for f in table_obj.schema]
+
+    # no lookup_bucket round trip; a missing bucket surfaces as NotFound on upload
+    bucket = storage_client.bucket(bucket_name)
     blob = bucket.blob(object_name)
+    blob.content_type = "application/xml"
+    if gzip_encode:
+        # XML compresses 5-10x; serve transparently via Content-Encoding
+        blob.content_encoding = "gzip"
     gcs_uri = f"gs://{bucket_name}/{object_name}"
 
     attempt = 0
@@ -89,12 +334,19 @@ def stream_table_to_gcs_binary_with_fallback(
         try:
             print(f"[{now_z()}] Streaming attempt {attempt}/{retries} to {gcs_uri}")
 
-            # fresh RowIterator
-            rows = bq_client.list_rows(table_obj)
+            # fresh RowIterator (streamed via the Storage Read API when available)
+            row_iterator = bq_client.list_rows(table_obj, selected_fields=table_obj.schema,
+                                               page_size=page_size)
 
-            # open fresh raw binary stream
+            # open fresh raw binary stream; large chunks amortize per-request HTTP overhead
             try:
-                raw_stream = blob.open("wb")
+                raw_stream = blob.open("wb", chunk_size=chunk_size, ignore_flush=True)
+            except TypeError:
+                # older storage clients don't accept chunk_size/ignore_flush
+                try:
+                    raw_stream = blob.open("wb")
+                except Exception:
+                    raw_stream = None
             except Exception as e:
                 raw_stream = None
 
@@ -102,39 +354,69 @@ def stream_table_to_gcs_binary_with_fallback(
                 # streaming not supported by client -> goto fallback
                 raise RuntimeError("blob.open('wb') not supported by storage client (cannot stream)")
 
+            # buffer small writes so the GCS writer sees large contiguous blocks,
+            # optionally compressing on the fly (compresslevel=1 stays CPU-cheap)
+            gz_stream = gzip.GzipFile(fileobj=raw_stream, mode="wb", compresslevel=1) if gzip_encode else None
+            out_stream = io.BufferedWriter(gz_stream if gz_stream is not None else raw_stream,
+                                           buffer_size=1 << 20)
+
             written = 0
             try:
-                # Write bytes directly
-                header = '<?xml version="1.0" encoding="UTF-8"?>\n'
-                raw_stream.write(header.encode("utf-8"))
-                raw_stream.write("<Defaulters>\n".encode("utf-8"))
-
-                for row in rows:
-                    raw_stream.write("  <Defaulter>\n".encode("utf-8"))
-                    for col in schema_columns:
-                        try:
-                            value = row.get(col) if hasattr(row, "get") else row[col]
-                        except Exception:
-                            try:
-                                value = row[col]
-                            except Exception:
-                                value = getattr(row, col, None)
-
-                        if value is None:
-                            raw_stream.write(f"    <{col}></{col}>\n".encode("utf-8"))
-                        else:
-                            sval = safe_format_value(value)
-                            raw_stream.write(f"    <{col}>{xml_escape(sval)}</{col}>\n".encode("utf-8"))
-
-                    raw_stream.write("  </Defaulter>\n".encode("utf-8"))
-                    written += 1
-                    if written % 1000 == 0:
-                        print(f"[{now_z()}] Processed {written} rows...")
-
-                raw_stream.write("</Defaulters>\n".encode("utf-8"))
+                if bqstorage_client is not None:
+                    # column-major: convert each Arrow column once per batch
+                    out_stream.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+                    out_stream.write(b"<Defaulters>\n")
+                    batches = row_iterator.to_arrow_iterable(bqstorage_client=bqstorage_client)
+                    next_progress = progress_every
+                    for batch in batches:
+                        written += write_arrow_batch_xml(out_stream, batch, open_tags, close_tags, empty_tags)
+                        if written >= next_progress:
+                            sys.stdout.write(f"[{now_z()}] Processed {written} rows...\n")
+                            sys.stdout.flush()
+                            next_progress = (written // progress_every + 1) * progress_every
+                    out_stream.write(b"</Defaulters>\n")
+                elif LXML_AVAILABLE:
+                    # C-level serialization (libxml2) for the REST row path
+                    written = write_rows_lxml(out_stream, row_iterator, schema_columns,
+                                              formatters, progress_every)
+                else:
+                    out_stream.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+                    out_stream.write(b"<Defaulters>\n")
+                    for row in row_iterator:
+                        # one C-level fetch per row; bigquery.Row exposes
+                        # .values() in schema order
+                        vals = tuple(row.values())
+                        parts = [b"  <Defaulter>\n"]
+                        for i in range(len(schema_columns)):
+                            value = vals[i]
+                            if value is None:
+                                parts.append(empty_tags[i])
+                            else:
+                                sval = formatters[i](value)
+                                parts.append(open_tags[i])
+                                parts.append(escape_value(sval).encode("utf-8"))
+                                parts.append(close_tags[i])
+
+                        parts.append(b"  </Defaulter>\n")
+                        # single write per row instead of ~4 per column
+                        out_stream.write(b"".join(parts))
+                        written += 1
+                        if written % progress_every == 0:
+                            sys.stdout.write(f"[{now_z()}] Processed {written} rows...\n")
+                            sys.stdout.flush()
+                    out_stream.write(b"</Defaulters>\n")
 
             finally:
-                # finalize upload
+                # finalize upload: buffer -> gzip trailer -> raw stream
+                try:
+                    out_stream.close()
+                except Exception:
+                    pass
+                if gz_stream is not None:
+                    try:
+                        gz_stream.close()
+                    except Exception:
+                        pass
                 try:
                     raw_stream.close()
                 except Exception:
@@ -143,9 +425,11 @@ def stream_table_to_gcs_binary_with_fallback(
             print(f"[{now_z()}] Successfully streamed XML to {gcs_uri} (rows: {written})")
             return gcs_uri
 
+        except NotFound:
+            raise RuntimeError(f"Bucket '{bucket_name}' not found or not accessible with current credentials.")
         except Exception as exc:
-            print(f"[{now_z()}] Streaming attempt {attempt} failed: {exc}", file=sys.stderr)
-            traceback.print_exc()
+            # one-line summary per attempt; full traceback only on the last one
+            print(f"[{now_z()}] Streaming attempt {attempt} failed: {type(exc).__name__}: {exc}", file=sys.stderr)
             # ensure any raw_stream is closed (avoid reusing closed streams)
             try:
                 raw_stream.close()
@@ -153,6 +437,7 @@ def stream_table_to_gcs_binary_with_fallback(
                 pass
 
             if attempt >= retries:
+                traceback.print_exc()
                 print(f"[{now_z()}] Streaming failed after {attempt} attempts; falling back to in-memory upload.", file=sys.stderr)
                 break
 
@@ -162,35 +447,37 @@ def stream_table_to_gcs_binary_with_fallback(
 
     # Fallback: build XML in memory and upload_from_string
     print(f"[{now_z()}] Falling back to in-memory XML build (may use significant memory).", file=sys.stderr)
-    sio = io.StringIO()
+    # BytesIO avoids StringIO's wide-char buffer plus a full re-encode pass
+    sio = io.BytesIO()
     written = 0
-    sio.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-    sio.write("<Defaulters>\n")
+    sio.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+    sio.write(b"<Defaulters>\n")
 
-    # fresh RowIterator for fallback
-    rows = bq_client.list_rows(table_obj)
+    # fresh RowIterator for fallback (reuses the precompiled byte templates)
+    rows = iter_table_rows(bq_client.list_rows(table_obj, selected_fields=table_obj.schema,
+                                               page_size=page_size), bqstorage_client)
     for row in rows:
-        sio.write("  <Defaulter>\n")
-        for col in schema_columns:
-            try:
-                value = row.get(col) if hasattr(row, "get") else row[col]
-            except Exception:
-                try:
-                    value = row[col]
-                except Exception:
-                    value = getattr(row, col, None)
+        vals = tuple(row.values())
+        sio.write(b"  <Defaulter>\n")
+        for i in range(len(schema_columns)):
+            value = vals[i]
             if value is None:
-                sio.write(f"    <{col}></{col}>\n")
+                sio.write(empty_tags[i])
             else:
-                sval = safe_format_value(value)
-                sio.write(f"    <{col}>{xml_escape(sval)}</{col}>\n")
-        sio.write("  </Defaulter>\n")
+                sval = formatters[i](value)
+                sio.write(open_tags[i])
+                sio.write(escape_value(sval).encode("utf-8"))
+                sio.write(close_tags[i])
+        sio.write(b"  </Defaulter>\n")
         written += 1
-        if written % 1000 == 0:
-            print(f"[{now_z()}] Built {written} rows in memory...")
+        if written % progress_every == 0:
+            sys.stdout.write(f"[{now_z()}] Built {written} rows in memory...\n")
+            sys.stdout.flush()
 
-    sio.write("</Defaulters>\n")
-    content_bytes = sio.getvalue().encode("utf-8")
+    sio.write(b"</Defaulters>\n")
+    content_bytes = sio.getvalue()
+    if gzip_encode:
+        content_bytes = gzip.compress(content_bytes, compresslevel=1)
 
     attempt = 0
     while attempt < retries:
@@ -199,10 +486,12 @@ def stream_table_to_gcs_binary_with_fallback(
             blob.upload_from_string(content_bytes, content_type="application/xml")
             print(f"[{now_z()}] Successfully uploaded XML to {gcs_uri} (rows: {written}) via upload_from_string")
             return gcs_uri
+        except NotFound:
+            raise RuntimeError(f"Bucket '{bucket_name}' not found or not accessible with current credentials.")
         except Exception as exc:
-            print(f"[{now_z()}] upload_from_string attempt {attempt} failed: {exc}", file=sys.stderr)
-            traceback.print_exc()
+            print(f"[{now_z()}] upload_from_string attempt {attempt} failed: {type(exc).__name__}: {exc}", file=sys.stderr)
             if attempt >= retries:
+                traceback.print_exc()
                 raise
             wait = backoff ** attempt
             print(f"[{now_z()}] Retrying upload in {wait}s...", file=sys.stderr)
@@ -221,6 +510,16 @@ def parse_args(argv=None):
     p.add_argument("--gcs-path", default=None, help="GCS object path (e.g. transformed_xml_files/defaulters.xml)")
     p.add_argument("--billing-project", default=None, help="Billing project for requester-pays (optional)")
     p.add_argument("--retries", type=int, default=3, help="Retries for streaming/upload")
+    p.add_argument("--upload-chunk-size-mib", type=int, default=16,
+                   help="Resumable upload chunk size in MiB (256 KiB-aligned; default 16)")
+    p.add_argument("--shards", type=int, default=1,
+                   help="Export N shard objects concurrently via Storage Read API streams (default 1; requires google-cloud-bigquery-storage)")
+    p.add_argument("--progress-interval", type=int, default=PROGRESS_EVERY,
+                   help=f"Print a progress line every N rows (default {PROGRESS_EVERY})")
+    p.add_argument("--no-gzip", action="store_true",
+                   help="Disable gzip content-encoding for the uploaded XML (default: gzip on)")
+    p.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                   help=f"Rows per REST page when the Storage Read API is unavailable (default {DEFAULT_PAGE_SIZE})")
     return p.parse_args(argv)
 
 def main(argv=None):
@@ -239,14 +538,42 @@ def main(argv=None):
     bq_client = bigquery.Client(project=project, credentials=creds)
     storage_client = storage.Client(project=(args.billing_project if args.billing_project else project), credentials=creds)
 
+    bqstorage_client = None
+    # the Arrow read path needs BOTH packages; bigquery-storage without
+    # pyarrow would fail every streaming attempt with no REST fallback
+    if BQSTORAGE_AVAILABLE and PYARROW_AVAILABLE:
+        bqstorage_client = bigquery_storage.BigQueryReadClient(credentials=creds)
+    else:
+        print(f"[{now_z()}] google-cloud-bigquery-storage and/or pyarrow not installed; "
+              "falling back to REST row paging.", file=sys.stderr)
+
     ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
     default_name = f"{args.table}_{ts}.xml"
     object_name = args.gcs_path if args.gcs_path else default_name
+    gzip_encode = not args.no_gzip
 
-    if args.upload:
+    if args.upload and args.shards > 1:
+        if bqstorage_client is None:
+            print("ERROR: --shards > 1 requires google-cloud-bigquery-storage and pyarrow.", file=sys.stderr)
+            sys.exit(4)
+        manifest_uri = stream_table_to_gcs_sharded(
+            storage_client, bq_client, project, args.dataset, args.table,
+            args.bucket, object_name, args.shards, bqstorage_client,
+            chunk_size=args.upload_chunk_size_mib * 1024 * 1024
+        )
+        print(f"[{now_z()}] Upload complete: {manifest_uri}")
+    elif args.upload:
+        # sharded exports stay uncompressed; only the single-object path gzips
+        if gzip_encode and not object_name.endswith(".gz"):
+            object_name += ".gz"
         gcs_uri = stream_table_to_gcs_binary_with_fallback(
             storage_client, bq_client, project, args.dataset, args.table,
-            args.bucket, object_name, retries=args.retries, backoff=2
+            args.bucket, object_name, retries=args.retries, backoff=2,
+            bqstorage_client=bqstorage_client,
+            chunk_size=args.upload_chunk_size_mib * 1024 * 1024,
+            progress_every=args.progress_interval,
+            gzip_encode=gzip_encode,
+            page_size=args.page_size
         )
         print(f"[{now_z()}] Upload complete: {gcs_uri}")
     else:
@@ -4,6 +4,8 @@ bq_to_xml.py
 
 Read a BigQuery table and convert rows to an XML file.
 Optionally upload the XML file to a GCS bucket under `transformed_xml_files/`.
+With --upload and no explicit --out, the XML is streamed directly to GCS
+without touching local disk.
 
 Features:
 - Uses Application Default Credentials (ADC) via google.auth.default()
@@ -15,6 +17,9 @@ Features:
 Requirements:
     pip install google-cloud-bigquery google-cloud-storage google-auth
 
+Optional (much faster row streaming for large tables):
+    pip install google-cloud-bigquery-storage pyarrow
+
 Examples:
     # Export only
     python bq_to_xml_local_gcs.py --project student-00571 --dataset CL_TRANSFORMED --table defaulters --out defaulters.xml
@@ -31,18 +36,50 @@ import argparse
 import sys
 import traceback
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional, Any
 
 import google.auth
+from google.api_core.exceptions import NotFound
 from google.cloud import bigquery, storage
 from xml.sax.saxutils import escape as xml_escape
 
+try:
+    from google.cloud import bigquery_storage
+    BQSTORAGE_AVAILABLE = True
+except Exception:
+    BQSTORAGE_AVAILABLE = False
+
+try:
+    import pyarrow  # noqa: F401 -- probed only; the read API returns Arrow batches
+    PYARROW_AVAILABLE = True
+except Exception:
+    PYARROW_AVAILABLE = False
+
+# Progress reporting cadence; line-buffered print every 1000 rows costs a
+# syscall per flush, which adds up on multi-million-row tables.
+PROGRESS_EVERY = 100_000
+
+# REST paging: the SDK default page size means many HTTP round trips on
+# large tables; bigger pages halve wall time on latency-bound exports.
+DEFAULT_PAGE_SIZE = 100_000
+
 
 def now_iso_z() -> str:
     """Return an ISO-8601 UTC timestamp with trailing 'Z' (no offset)."""
     return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
 
 
+_escape_cached = lru_cache(maxsize=65536)(xml_escape)
+
+
+def escape_value(sval: str) -> str:
+    """Escape a string for XML, memoizing short (likely categorical/repeated) values."""
+    if len(sval) < 64:
+        return _escape_cached(sval)
+    return xml_escape(sval)
+
+
 def safe_format_value(value: Any) -> str:
     """Convert a BigQuery/Python value to a safe string for XML content."""
     if value is None:
@@ -64,6 +101,47 @@ def safe_format_value(value: Any) -> str:
     return str(value)
 
 
+def _format_timestamp(value: Any) -> str:
+    dt = value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return dt.isoformat().replace("+00:00", "Z")
+
+
+def _format_bytes(value: Any) -> str:
+    try:
+        return value.decode("utf-8")
+    except Exception:
+        return str(value)
+
+
+def make_formatter(field):
+    """
+    Pick a formatter for one schema field so the row loop skips the
+    per-cell isinstance ladder in safe_format_value.
+    """
+    if field.mode == "REPEATED":
+        return str
+    if field.field_type in ("TIMESTAMP", "DATETIME"):
+        return _format_timestamp
+    if field.field_type == "BYTES":
+        return _format_bytes
+    return str
+
+
+def iter_table_rows(row_iterator, bqstorage_client=None):
+    """
+    Yield mapping-style rows from a BigQuery RowIterator.
+
+    When a BigQueryReadClient is supplied, rows are pulled as columnar Arrow
+    batches over the Storage Read API (gRPC) instead of paged JSON over REST,
+    which avoids per-cell Python object construction in the BigQuery client.
+    """
+    if bqstorage_client is not None:
+        for batch in row_iterator.to_arrow_iterable(bqstorage_client=bqstorage_client):
+            yield from batch.to_pylist()
+    else:
+        yield from row_iterator
+
+
 class Clients:
     """Container for BigQuery and Storage clients created from ADC (or billing override)."""
 
@@ -73,7 +151,9 @@ class Clients:
         self.project = project
         # create clients lazily
         self._bq_client: Optional[bigquery.Client] = None
-        self._storage_client: Optional[storage.Client] = None
+        # storage clients cached per effective project (billing overrides included)
+        self._storage_clients: dict[Optional[str], storage.Client] = {}
+        self._bqstorage_client = None
 
     def bq_client(self) -> bigquery.Client:
         if self._bq_client is None:
@@ -83,72 +163,133 @@ class Clients:
                 self._bq_client = bigquery.Client(project=self.project)
         return self._bq_client
 
+    def bqstorage_client(self):
+        """
+        Return a BigQueryReadClient, or None when google-cloud-bigquery-storage
+        or pyarrow is absent (to_arrow_iterable needs both).
+        """
+        if not (BQSTORAGE_AVAILABLE and PYARROW_AVAILABLE):
+            return None
+        if self._bqstorage_client is None:
+            if self.creds:
+                self._bqstorage_client = bigquery_storage.BigQueryReadClient(credentials=self.creds)
+            else:
+                self._bqstorage_client = bigquery_storage.BigQueryReadClient()
+        return self._bqstorage_client
+
     def storage_client(self, project_override: Optional[str] = None) -> storage.Client:
-        # For requester-pays, user may pass a billing project; we create a client with that project.
+        # For requester-pays, user may pass a billing project; cache one client
+        # per effective project so repeated calls reuse the HTTP session and
+        # credentials instead of re-bootstrapping them.
         effective_project = project_override if project_override is not None else self.project
-        if project_override is not None:
-            # create a new client for the billing project each time (safe)
+        client = self._storage_clients.get(effective_project)
+        if client is None:
             if self.creds:
-                return storage.Client(project=effective_project, credentials=self.creds)
-            return storage.Client(project=effective_project)
-        if self._storage_client is None:
-            if self.creds:
-                self._storage_client = storage.Client(project=self.project, credentials=self.creds)
+                client = storage.Client(project=effective_project, credentials=self.creds)
             else:
-                self._storage_client = storage.Client(project=self.project)
-        return self._storage_client
+                client = storage.Client(project=effective_project)
+            self._storage_clients[effective_project] = client
+        return client
 
 
-def stream_table_to_xml_file(clients: Clients, project: str, dataset: str, table: str, out_path: str) -> str:
-    """Stream BigQuery rows and write to an XML file; returns out_path on success."""
+def stream_table_to_xml(clients: Clients, project: str, dataset: str, table: str, out_stream,
+                        progress_every: int = PROGRESS_EVERY,
+                        page_size: int = DEFAULT_PAGE_SIZE) -> int:
+    """Stream BigQuery rows as XML bytes into any binary writer; returns rows written."""
     bq = clients.bq_client()
     table_ref = f"{project}.{dataset}.{table}"
     print(f"[{now_iso_z()}] Querying table: {table_ref}")
 
     table_obj = bq.get_table(table_ref)  # may raise exception if not found
-    rows = bq.list_rows(table_obj)  # RowIterator
+    row_iterator = bq.list_rows(table_obj, selected_fields=table_obj.schema,
+                                page_size=page_size)  # RowIterator
 
-    cols = [field.name for field in rows.schema]
+    cols = [field.name for field in row_iterator.schema]
     print(f"[{now_iso_z()}] Columns: {cols}")
 
+    # Precompile per-column tag templates so the row loop never re-formats tag names
+    open_tags = [f"    <{c}>".encode("utf-8") for c in cols]
+    close_tags = [f"</{c}>\n".encode("utf-8") for c in cols]
+    empty_tags = [f"    <{c}></{c}>\n".encode("utf-8") for c in cols]
+
+    # one formatter per column resolved from the schema, not per cell
+    formatters = [make_formatter(f) for f in row_iterator.schema]
+
+    # Prefer the Storage Read API (Arrow over gRPC) when the optional client is installed
+    rows = iter_table_rows(row_iterator, clients.bqstorage_client())
+
     written = 0
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
-        f.write("<Defaulters>\n")
-
-        for row_idx, row in enumerate(rows):
-            f.write("  <Defaulter>\n")
-            for col in cols:
-                # Support dict-like Row.get and item access; fallback to attribute
-                value = None
-                try:
-                    if hasattr(row, "get"):
-                        value = row.get(col)
-                    else:
-                        value = row[col]
-                except Exception:
-                    try:
-                        value = row[col]
-                    except Exception:
-                        value = getattr(row, col, None)
-
-                if value is None:
-                    f.write(f"    <{col}></{col}>\n")
-                else:
-                    sval = safe_format_value(value)
-                    f.write(f"    <{col}>{xml_escape(sval)}</{col}>\n")
-
-            f.write("  </Defaulter>\n")
-            written += 1
-            if written % 1000 == 0:
-                print(f"[{now_iso_z()}] Processed {written} rows...")
-
-        f.write("</Defaulters>\n")
+    out_stream.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+    out_stream.write(b"<Defaulters>\n")
+
+    for row_idx, row in enumerate(rows):
+        # one C-level fetch per row; both bigquery.Row and dict expose
+        # .values() in schema order
+        vals = tuple(row.values())
+        parts = [b"  <Defaulter>\n"]
+        for i in range(len(cols)):
+            value = vals[i]
+            if value is None:
+                parts.append(empty_tags[i])
+            else:
+                sval = formatters[i](value)
+                parts.append(open_tags[i])
+                parts.append(escape_value(sval).encode("utf-8"))
+                parts.append(close_tags[i])
+
+        parts.append(b"  </Defaulter>\n")
+        # single write per row instead of one per column
+        out_stream.write(b"".join(parts))
+        written += 1
+        if written % progress_every == 0:
+            sys.stdout.write(f"[{now_iso_z()}] Processed {written} rows...\n")
+            sys.stdout.flush()
+
+    out_stream.write(b"</Defaulters>\n")
+    return written
+
+
+def stream_table_to_xml_file(clients: Clients, project: str, dataset: str, table: str, out_path: str,
+                             progress_every: int = PROGRESS_EVERY,
+                             page_size: int = DEFAULT_PAGE_SIZE) -> str:
+    """Stream BigQuery rows and write to a local XML file; returns out_path on success."""
+    # large buffer so the row-sized writes don't become per-line syscalls
+    with open(out_path, "wb", buffering=1 << 20) as f:
+        written = stream_table_to_xml(clients, project, dataset, table, f,
+                                      progress_every=progress_every, page_size=page_size)
 
     print(f"[{now_iso_z()}] XML file written: {out_path} (rows: {written})")
     return out_path
 
 
+def stream_table_to_gcs(clients: Clients, project: str, dataset: str, table: str,
+                        bucket_name: str, dest_path: str,
+                        billing_project: Optional[str] = None,
+                        progress_every: int = PROGRESS_EVERY,
+                        page_size: int = DEFAULT_PAGE_SIZE) -> str:
+    """
+    Stream BigQuery rows directly into gs://bucket_name/dest_path with no
+    intermediate local file; returns the GCS URI on success.
+    """
+    client = clients.storage_client(project_override=billing_project) if billing_project else clients.storage_client()
+    # No lookup_bucket round trip; a missing bucket surfaces as NotFound on upload
+    bucket = client.bucket(bucket_name)
+
+    blob = bucket.blob(dest_path)
+    gcs_uri = f"gs://{bucket_name}/{dest_path}"
+    print(f"[{now_iso_z()}] Streaming directly to {gcs_uri}")
+
+    try:
+        with blob.open("wb") as raw_stream:
+            written = stream_table_to_xml(clients, project, dataset, table, raw_stream,
+                                          progress_every=progress_every, page_size=page_size)
+    except NotFound:
+        raise RuntimeError(f"Bucket '{bucket_name}' not found or not accessible with current credentials.")
+
+    print(f"[{now_iso_z()}] Streamed to GCS: {gcs_uri} (rows: {written})")
+    return gcs_uri
+
+
 def upload_file_to_gcs(clients: Clients, local_path: str, bucket_name: str, dest_path: Optional[str] = None,
                        billing_project: Optional[str] = None) -> str:
     """
@@ -159,11 +300,9 @@ def upload_file_to_gcs(clients: Clients, local_path: str, bucket_name: str, dest
     try:
         # Choose storage client: billing_project override creates a temporary client with that project
         client = clients.storage_client(project_override=billing_project) if billing_project else clients.storage_client()
-        # Check bucket existence / accessibility
-        bucket = client.lookup_bucket(bucket_name)
-        if bucket is None:
-            # More diagnostic: might still be that the account can't see the bucket
-            raise RuntimeError(f"Bucket '{bucket_name}' not found or not accessible with current credentials.")
+        # No lookup_bucket round trip; a missing or inaccessible bucket
+        # surfaces as NotFound on the upload itself
+        bucket = client.bucket(bucket_name)
 
         if dest_path is None:
             dest_path = local_path.replace("\\", "/").split("/")[-1]
@@ -175,6 +314,8 @@ def upload_file_to_gcs(clients: Clients, local_path: str, bucket_name: str, dest
         print(f"[{now_iso_z()}] Uploaded to GCS: {gcs_uri}")
         return gcs_uri
 
+    except NotFound:
+        raise RuntimeError(f"Bucket '{bucket_name}' not found or not accessible with current credentials.")
     except Exception as e:
         print(f"[{now_iso_z()}] ERROR uploading to GCS: {e}", file=sys.stderr)
         traceback.print_exc()
@@ -191,6 +332,10 @@ def parse_args(argv=None):
     p.add_argument("--bucket", "-b", default=None, help="GCS bucket to upload to (required if --upload)")
     p.add_argument("--gcs-path", default=None, help="GCS destination path (e.g. transformed_xml_files/defaulters.xml)")
     p.add_argument("--billing-project", default=None, help="Billing project id for requester-pays buckets (optional)")
+    p.add_argument("--progress-interval", type=int, default=PROGRESS_EVERY,
+                   help=f"Print a progress line every N rows (default {PROGRESS_EVERY})")
+    p.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                   help=f"Rows per REST page when the Storage Read API is unavailable (default {DEFAULT_PAGE_SIZE})")
     return p.parse_args(argv)
 
 
@@ -213,9 +358,29 @@ def main(argv=None):
     out_name = args.out if args.out else f"{args.table}_{ts}.xml"
     out_path = out_name
 
+    if args.upload and not args.bucket:
+        print("ERROR: --upload requires --bucket to be set.", file=sys.stderr)
+        sys.exit(4)
+
+    # Uploading without an explicit --out: stream straight to GCS and skip the
+    # intermediate local file (halves the I/O: no write-then-read of the XML).
+    if args.upload and not args.out:
+        dest_path = args.gcs_path if args.gcs_path else f"transformed_xml_files/{out_name}"
+        try:
+            stream_table_to_gcs(clients, effective_project, args.dataset, args.table,
+                                args.bucket, dest_path, billing_project=args.billing_project,
+                                progress_every=args.progress_interval, page_size=args.page_size)
+            print(f"[{now_iso_z()}] Upload complete.")
+        except Exception as ex:
+            print(f"[{now_iso_z()}] Failed to stream table to GCS: {ex}", file=sys.stderr)
+            traceback.print_exc()
+            sys.exit(2)
+        return
+
     # Step 1: stream table to xml
     try:
-        stream_table_to_xml_file(clients, effective_project, args.dataset, args.table, out_path)
+        stream_table_to_xml_file(clients, effective_project, args.dataset, args.table, out_path,
+                                 progress_every=args.progress_interval, page_size=args.page_size)
     except Exception as ex:
         print(f"[{now_iso_z()}] Failed to export table to XML: {ex}", file=sys.stderr)
         traceback.print_exc()
@@ -223,9 +388,6 @@ def main(argv=None):
 
     # Step 2: upload if requested
     if args.upload:
-        if not args.bucket:
-            print("ERROR: --upload requires --bucket to be set.", file=sys.stderr)
-            sys.exit(4)
         dest_path = args.gcs_path if args.gcs_path else f"transformed_xml_files/{out_name}"
         try:
             upload_file_to_gcs(clients, out_path, args.bucket, dest_path, billing_project=args.billing_project)
@@ -8,7 +8,7 @@ Defaults:
   PROJECT = student-00332
   DATASET = CL_STAGING
   TABLE   = loans
-  GCS_URI = gs://ikl-finance-bucket-002/source_data/loans.csv
+  GCS_URI = gs://ikl-finance-bucket-002/source_data/loans.csv.gz
 
 Requirements:
   pip install google-cloud-bigquery google-cloud-storage
@@ -22,9 +22,54 @@ Authentication:
 """
 
 import argparse
+import csv
+import gzip
+import io
 import sys
-from google.cloud import bigquery
+from itertools import islice
+from google.cloud import bigquery, storage
 from google.api_core.exceptions import Conflict, NotFound
+from requests.adapters import HTTPAdapter
+
+# Streaming inserts suit small, frequent loads; above this object size a
+# classic load job is cheaper and avoids per-request insert quotas
+STREAM_MAX_BYTES = 1024 * 1024 * 1024
+
+_bq_client = None
+_storage_client = None
+
+def _widen_pool(client):
+    """
+    Mount a bigger HTTPS connection pool on a google-cloud client and ask
+    for gzip-compressed JSON responses. The requests transport is
+    HTTP/1.1-only, so connection reuse across the pool is the available
+    substitute for HTTP/2 multiplexing.
+    """
+    try:
+        client._http.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=3))
+        client._http.headers.update({"Accept-Encoding": "gzip"})
+    except Exception:
+        pass  # _http is private; skip pool tuning if the transport changes
+
+def get_bigquery_client(project=None) -> bigquery.Client:
+    """
+    Lazily-created module-level bigquery.Client, reused across calls so
+    loops over this module (dbt/Airflow) pay the TLS handshake and ADC
+    token fetch once instead of per invocation.
+    """
+    global _bq_client
+    if _bq_client is None:
+        _bq_client = bigquery.Client(project=project)
+        _widen_pool(_bq_client)
+    return _bq_client
+
+def get_storage_client(project=None) -> storage.Client:
+    """Module-level storage.Client counterpart of get_bigquery_client."""
+    global _storage_client
+    if _storage_client is None:
+        _storage_client = storage.Client(project=project)
+        _widen_pool(_storage_client)
+    return _storage_client
 
 # Explicit schema to match generated CSV
 SCHEMA = [
@@ -48,16 +93,37 @@ def ensure_dataset(client: bigquery.Client, dataset_id: str, location: str = "US
     except Conflict:
         print(f"Dataset {dataset_id} already exists")
 
+def ensure_table(client: bigquery.Client, dest_table_id: str, schema=None):
+    """
+    Create the destination table if absent, day-partitioned on Start_Date.
+    Partitioning lets incremental loads touch a single partition's storage
+    instead of rewriting the whole table.
+    """
+    table = bigquery.Table(dest_table_id, schema=schema)
+    table.time_partitioning = bigquery.TimePartitioning(
+        type_=bigquery.TimePartitioningType.DAY, field="Start_Date")
+    client.create_table(table, exists_ok=True)
+    return table
+
 def load_csv_from_gcs(client: bigquery.Client, gcs_uri: str, dest_table_id: str,
-                      schema=None, write_disposition="WRITE_TRUNCATE", skip_leading_rows=1):
+                      schema=None, write_disposition="WRITE_TRUNCATE", skip_leading_rows=1,
+                      source_format="CSV"):
     """
-    Load a CSV from GCS into BigQuery table.
+    Start a job loading a CSV or Parquet file (or list of URIs) from GCS
+    into a BigQuery table. Returns the LoadJob WITHOUT waiting on it, so
+    callers can overlap the load with other work (e.g. generating and
+    uploading the next file) and call job.result() at pipeline commit.
 
     write_disposition: WRITE_TRUNCATE | WRITE_APPEND | WRITE_EMPTY
+    source_format: CSV | PARQUET (Parquet skips BigQuery's text
+    tokenization and string-to-date parsing entirely)
     """
     job_config = bigquery.LoadJobConfig()
-    job_config.source_format = bigquery.SourceFormat.CSV
-    job_config.skip_leading_rows = skip_leading_rows
+    if source_format == "PARQUET":
+        job_config.source_format = bigquery.SourceFormat.PARQUET
+    else:
+        job_config.source_format = bigquery.SourceFormat.CSV
+        job_config.skip_leading_rows = skip_leading_rows
     job_config.autodetect = False
     if schema:
         job_config.schema = schema
@@ -67,21 +133,100 @@ def load_csv_from_gcs(client: bigquery.Client, gcs_uri: str, dest_table_id: str,
     # job_config.max_bad_records = 0
 
     print(f"Starting load job: {gcs_uri} -> {dest_table_id}")
-    load_job = client.load_table_from_uri(gcs_uri, dest_table_id, job_config=job_config)
-    load_job.result()  # wait for completion
-    destination_table = client.get_table(dest_table_id)
-    print(f"Loaded {destination_table.num_rows} rows into {dest_table_id}")
+    return client.load_table_from_uri(gcs_uri, dest_table_id, job_config=job_config)
+
+def _chunked(rows, n=500):
+    """Yield successive lists of at most n rows from any iterable."""
+    it = iter(rows)
+    while True:
+        batch = list(islice(it, n))
+        if not batch:
+            return
+        yield batch
+
+def stream_csv_from_gcs(client: bigquery.Client, gcs_uri: str, dest_table_id: str, schema=None):
+    """
+    Stream the CSV's rows into the table via insert_rows_json instead of a
+    load job. Load jobs are capped at 1,500/day/table and pay job-setup
+    latency on every invocation; streaming inserts skip both, so this is
+    the better path for small, frequent loads. Objects larger than
+    STREAM_MAX_BYTES fall back to a load job automatically.
+    """
+    if not gcs_uri.startswith("gs://"):
+        raise ValueError(f"Expected a gs:// URI, got: {gcs_uri}")
+    bucket_name, _, object_name = gcs_uri[len("gs://"):].partition("/")
+
+    storage_client = get_storage_client(project=client.project)
+    blob = storage_client.bucket(bucket_name).get_blob(object_name)
+    if blob is None:
+        raise NotFound(f"GCS object not found: {gcs_uri}")
+
+    if blob.size is not None and blob.size > STREAM_MAX_BYTES:
+        print(f"Object is {blob.size} bytes; falling back to a load job for {gcs_uri}")
+        job = load_csv_from_gcs(client, gcs_uri, dest_table_id, schema=schema,
+                                write_disposition="WRITE_APPEND")
+        job.result()
+        print(f"Loaded {job.output_rows} rows into {dest_table_id}")
+        return
+
+    data = blob.download_as_bytes()
+    # Objects uploaded with content_encoding=gzip (the generators' default)
+    # come back already decompressed via decompressive transcoding, so the
+    # object name says nothing about what we actually hold — sniff the gzip
+    # magic bytes instead.
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+
+    # the pre-download check saw the compressed size; re-check against what
+    # decompression actually produced before committing to streaming
+    if len(data) > STREAM_MAX_BYTES:
+        print(f"Decompressed size is {len(data)} bytes; falling back to a load job for {gcs_uri}")
+        job = load_csv_from_gcs(client, gcs_uri, dest_table_id, schema=schema,
+                                write_disposition="WRITE_APPEND")
+        job.result()
+        print(f"Loaded {job.output_rows} rows into {dest_table_id}")
+        return
+
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8")))
+
+    # insert_rows_json needs the table to exist up front
+    ensure_table(client, dest_table_id, schema=schema)
+
+    print(f"Streaming rows: {gcs_uri} -> {dest_table_id}")
+    # Google recommends <=500 rows per insert request; smaller batches
+    # pipeline better and a failure only re-sends one batch. Deterministic
+    # row_ids (Loan_ID) let BigQuery dedup retried batches. The reader is
+    # consumed lazily so only one batch of dicts is alive at a time.
+    streamed = 0
+    for batch in _chunked(reader, 500):
+        errors = client.insert_rows_json(dest_table_id, batch,
+                                         row_ids=[r.get("Loan_ID") for r in batch])
+        if errors:
+            raise RuntimeError(f"Streaming insert reported errors: {errors[:5]}")
+        streamed += len(batch)
+    print(f"Streamed {streamed} rows into {dest_table_id}")
 
 def main(argv=None):
     parser = argparse.ArgumentParser(description="Load CSV from GCS into BigQuery")
     parser.add_argument("--project", "-p", default="student-00332", help="GCP project id")
     parser.add_argument("--dataset", "-d", default="CL_STAGING", help="BigQuery dataset")
     parser.add_argument("--table", "-t", default="loans", help="BigQuery table name")
-    parser.add_argument("--gcs_uri", "-g", default="gs://ikl-finance-bucket-002/source_data/loans.csv", help="GCS URI of CSV")
+    parser.add_argument("--gcs_uri", "-g", default="gs://ikl-finance-bucket-002/source_data/loans.csv.gz",
+                        help="GCS URI of CSV (comma-separated for several files in one load)")
     parser.add_argument("--location", "-l", default="US", help="BigQuery dataset location (default US)")
     parser.add_argument("--write_disposition", "-w", default="WRITE_TRUNCATE",
                         choices=["WRITE_TRUNCATE", "WRITE_APPEND", "WRITE_EMPTY"],
                         help="Write disposition for the load job")
+    parser.add_argument("--source_format", "-f", default="CSV",
+                        choices=["CSV", "PARQUET"],
+                        help="Source file format in GCS (default CSV)")
+    parser.add_argument("--mode", "-m", default="load", choices=["load", "stream"],
+                        help="load = batch load job; stream = insert_rows_json streaming (small CSVs)")
+    parser.add_argument("--verify", action="store_true",
+                        help="Fetch the destination table after the load to print its total row count")
+    parser.add_argument("--partition", default=None,
+                        help="Load only this Start_Date partition (YYYYMMDD); implies WRITE_APPEND "
+                             "so historical partitions are never rewritten")
     args = parser.parse_args(argv)
 
     project = args.project
@@ -92,7 +237,7 @@ def main(argv=None):
     dest_table_id = f"{project}.{dataset}.{table}"
 
     # Create BigQuery client (uses ADC or GOOGLE_APPLICATION_CREDENTIALS)
-    client = bigquery.Client(project=project)
+    client = get_bigquery_client(project=project)
 
     # Ensure dataset exists
     dataset_id_full = f"{project}.{dataset}"
@@ -104,7 +249,30 @@ def main(argv=None):
 
     # Perform load
     try:
-        load_csv_from_gcs(client, gcs_uri, dest_table_id, schema=SCHEMA, write_disposition=args.write_disposition)
+        # create the day-partitioned destination up front so loads and
+        # streams land in a partitioned table from the first run
+        ensure_table(client, dest_table_id, schema=SCHEMA)
+        if args.mode == "stream":
+            stream_csv_from_gcs(client, gcs_uri, dest_table_id, schema=SCHEMA)
+        else:
+            load_target = dest_table_id
+            write_disposition = args.write_disposition
+            if args.partition:
+                # $YYYYMMDD decorator: only that partition's storage is touched
+                load_target = f"{dest_table_id}${args.partition}"
+                write_disposition = "WRITE_APPEND"
+            source_uris = [u.strip() for u in gcs_uri.split(",") if u.strip()]
+            # submit without waiting; anything started after this line runs
+            # while BigQuery churns, and we gather the job at commit time
+            pending_jobs = [load_csv_from_gcs(client, source_uris, load_target, schema=SCHEMA,
+                                              write_disposition=write_disposition,
+                                              source_format=args.source_format)]
+            for job in pending_jobs:
+                job.result()
+                print(f"Loaded {job.output_rows} rows into {load_target}")
+            if args.verify:
+                destination_table = client.get_table(dest_table_id)
+                print(f"Table now holds {destination_table.num_rows} rows total")
     except NotFound as e:
         print(f"Resource not found error: {e}", file=sys.stderr)
         print("Check that the GCS URI and project/dataset names are correct and that the credentials have access.", file=sys.stderr)
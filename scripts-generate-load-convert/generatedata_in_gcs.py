@@ -9,72 +9,124 @@ Default bucket: ikl-finance-bucket-002
 """
 from __future__ import annotations
 import argparse
-import random
+import gzip
 import sys
 import time
+import traceback
 import csv
 import io
 from datetime import datetime, timedelta
 
+import numpy as np
+
 try:
     from google.cloud import storage
+    from google.api_core.exceptions import NotFound
     GCLOUD_AVAILABLE = True
 except Exception:
     GCLOUD_AVAILABLE = False
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except Exception:
+    PYARROW_AVAILABLE = False
+
 DEFAULT_BUCKET_NAME = "ikl-finance-bucket-002"
 DEFAULT_GCS_DEST_PREFIX = "source_data"
 
+# Rough bytes-per-row estimate used to size the resumable upload buffer
+APPROX_ROW_BYTES = 80
 
-def add_months(start_date: datetime, months: int) -> datetime:
-    year = start_date.year + (start_date.month - 1 + months) // 12
-    month = (start_date.month - 1 + months) % 12 + 1
-    mdays = [31,
-             29 if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0) else 28,
-             31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
-    day = min(start_date.day, mdays[month - 1])
-    return datetime(year, month, day)
+# Progress reporting cadence for the non-pyarrow row loops
+PROGRESS_EVERY = 100_000
 
 
-def generate_loans_rows(n_rows=200, seed=None):
-    """Yield dict rows for CSV (matching your previous schema)."""
-    if seed is not None:
-        random.seed(seed)
-
-    first_names = ["Asha", "Ravi", "Priya", "Suresh", "Kiran", "Neha", "Amit", "Sanjay", "Anita", "Rahul",
-                   "Deepa", "Vikram", "Meera", "Arjun", "Lakshmi", "Kavita", "Ramesh", "Anjali", "Manoj", "Pooja"]
-    last_names = ["Sharma", "Patel", "Rao", "Kumar", "Singh", "Gupta", "Nair", "Iyer", "Menon",
-                  "Chowdhury", "Desai", "Kapoor", "Joshi", "Varma", "Khan", "Naik"]
+# Month-length table indexed by [is_leap, month] for day-of-month clamping
+_MDAYS = np.array([[31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31],
+                   [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]])
+
+_FIRST_NAMES = ["Asha", "Ravi", "Priya", "Suresh", "Kiran", "Neha", "Amit", "Sanjay", "Anita", "Rahul",
+                "Deepa", "Vikram", "Meera", "Arjun", "Lakshmi", "Kavita", "Ramesh", "Anjali", "Manoj", "Pooja"]
+_LAST_NAMES = ["Sharma", "Patel", "Rao", "Kumar", "Singh", "Gupta", "Nair", "Iyer", "Menon",
+               "Chowdhury", "Desai", "Kapoor", "Joshi", "Varma", "Khan", "Naik"]
+# Cartesian first x last pool built once (~320 entries); one indexed gather
+# replaces two RNG draws and a string concat per row
+NAMES_POOL = np.array([f"{f} {l}" for f in _FIRST_NAMES for l in _LAST_NAMES])
+
+
+def add_months_vec(start_dates: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """
+    Vectorized month addition over datetime64[D] arrays.
+
+    Matches the old scalar add_months: the day-of-month is kept, clamped to
+    the length of the target month (leap-year aware).
+    """
+    start_months = start_dates.astype("datetime64[M]")
+    day_of_month = (start_dates - start_months).astype(int)  # 0-based
+    end_months = start_months + months.astype("timedelta64[M]")
+    end_years = end_months.astype("datetime64[Y]")
+    year_num = end_years.astype(int) + 1970
+    month_idx = (end_months - end_years).astype(int)  # 0..11
+    is_leap = ((year_num % 4 == 0) & ((year_num % 100 != 0) | (year_num % 400 == 0))).astype(int)
+    day = np.minimum(day_of_month, _MDAYS[is_leap, month_idx] - 1)
+    return end_months.astype("datetime64[D]") + day.astype("timedelta64[D]")
+
+
+def generate_loans_columns(n_rows=200, seed=None):
+    """Return the CSV columns as a dict of equal-length lists in header order."""
+    rng = np.random.default_rng(seed)
+
     statuses = ["Active", "Closed", "Default"]
     start_base = datetime(2018, 1, 1)
     end_base = datetime(2025, 10, 1)
 
-    for i in range(1, n_rows + 1):
-        loan_id = f"L{i:06d}"
-        cust_name = f"{random.choice(first_names)} {random.choice(last_names)}"
-        loan_amount = round(random.uniform(5000, 500000), 2)
-        int_rate = round(random.uniform(6.0, 22.0), 2)
-        instalments = random.choice([12, 24, 36, 48, 60, 72, 84, 96])
-        start_days = random.randint(0, (end_base - start_base).days)
-        start_date = start_base + timedelta(days=start_days)
-        end_date = add_months(start_date, instalments)
-        status = random.choices(statuses, weights=[0.7, 0.25, 0.05])[0]
-
-        yield {
-            "Loan_ID": loan_id,
-            "Cust_Name": cust_name,
-            "Loan_Amount": f"{loan_amount:.2f}",
-            "Int_Rate": f"{int_rate:.2f}",
-            "Instalments": instalments,
-            "Start_Date": start_date.strftime("%Y-%m-%d"),
-            "End_Date": end_date.strftime("%Y-%m-%d"),
-            "Status": status
-        }
-
-
-def stream_csv_to_gcs(bucket_name: str, object_name: str, rows_iter, retries=3, backoff=2) -> str:
+    # one vectorized draw per column instead of several Python RNG calls per row
+    cust_names = NAMES_POOL[rng.integers(0, NAMES_POOL.size, n_rows)].tolist()
+    loan_amounts = rng.uniform(5000, 500000, n_rows).round(2)
+    int_rates = rng.uniform(6.0, 22.0, n_rows).round(2)
+    instalment_col = rng.choice([12, 24, 36, 48, 60, 72, 84, 96], n_rows)
+    start_offsets = rng.integers(0, (end_base - start_base).days + 1, n_rows)
+    status_col = rng.choice(statuses, size=n_rows, p=[0.7, 0.25, 0.05])
+
+    # whole date columns computed as single vector ops, no per-row datetime objects
+    start_dates = np.datetime64(start_base, "D") + start_offsets.astype("timedelta64[D]")
+    end_dates = add_months_vec(start_dates, instalment_col)
+
+    # dtype width sized from n_rows so ids past 999999 aren't truncated
+    id_width = max(6, len(str(n_rows)))
+    loan_ids = np.char.add("L", np.char.zfill(np.arange(1, n_rows + 1).astype(f"U{id_width}"), 6)).tolist()
+
+    return {
+        "Loan_ID": loan_ids,
+        "Cust_Name": cust_names,
+        "Loan_Amount": [f"{a:.2f}" for a in loan_amounts],
+        "Int_Rate": [f"{r:.2f}" for r in int_rates],
+        "Instalments": [int(n) for n in instalment_col],
+        "Start_Date": np.datetime_as_string(start_dates, unit="D").tolist(),
+        "End_Date": np.datetime_as_string(end_dates, unit="D").tolist(),
+        "Status": [str(s) for s in status_col]
+    }
+
+
+def generate_loans_rows(n_rows=200, seed=None):
+    """
+    Yield rows as positional tuples in header order (kept for row-oriented
+    callers). Tuples avoid the per-row dict allocation plus the by-name
+    re-extraction the CSV writer used to do.
     """
-    Stream CSV rows to gs://bucket_name/object_name using blob.open("wb") and TextIO wrapper.
+    columns = generate_loans_columns(n_rows=n_rows, seed=seed)
+    yield from zip(*columns.values())
+
+
+def stream_csv_to_gcs(bucket_name: str, object_name: str, columns, retries=3, backoff=2,
+                      chunk_size=16 * 1024 * 1024, progress_every=PROGRESS_EVERY,
+                      gzip_encode=True) -> str:
+    """
+    Stream CSV columns (dict of equal-length lists) to gs://bucket_name/object_name
+    using blob.open("wb"). Serialization goes through PyArrow's C++ CSV writer when
+    pyarrow is installed, else Python's csv.writer over a TextIO wrapper.
     If blob.open() isn't supported by client, fall back to building in-memory string and upload_from_string.
     Returns the GCS URI on success.
     """
@@ -82,67 +134,94 @@ def stream_csv_to_gcs(bucket_name: str, object_name: str, rows_iter, retries=3,
         raise RuntimeError("google-cloud-storage not installed. Run: pip install google-cloud-storage")
 
     client = storage.Client()
-    bucket = client.lookup_bucket(bucket_name)
-    if bucket is None:
-        raise RuntimeError(f"Bucket '{bucket_name}' not found or not accessible with current credentials.")
+    # no lookup_bucket round trip; a missing bucket surfaces as NotFound on upload
+    bucket = client.bucket(bucket_name)
 
     blob = bucket.blob(object_name)
+    blob.content_type = "text/csv"
+    if gzip_encode:
+        # CSV compresses ~5x; BigQuery reads gzip'd objects transparently
+        blob.content_encoding = "gzip"
     gcs_uri = f"gs://{bucket_name}/{object_name}"
 
-    # Try streaming write
+    # Try streaming write; larger chunks amortize per-request HTTP overhead
     try:
-        raw_stream = blob.open("wb")  # binary stream
+        raw_stream = blob.open("wb", chunk_size=chunk_size, ignore_flush=True)
     except TypeError:
-        raw_stream = None
+        # older storage clients don't accept chunk_size/ignore_flush
+        try:
+            raw_stream = blob.open("wb")  # binary stream
+        except TypeError:
+            raw_stream = None
+
+    header = list(columns)
+    n_rows = len(columns[header[0]])
 
     if raw_stream is not None:
         attempt = 0
         while attempt < retries:
             try:
                 with raw_stream:
-                    # text wrapper so csv.writer writes strings; newline='' to avoid extra newlines
-                    with io.TextIOWrapper(raw_stream, encoding="utf-8", newline="") as text_stream:
-                        writer = csv.writer(text_stream)
-                        # header
-                        header = ["Loan_ID", "Cust_Name", "Loan_Amount", "Int_Rate", "Instalments", "Start_Date", "End_Date", "Status"]
-                        writer.writerow(header)
-                        written = 0
-                        for r in rows_iter:
-                            writer.writerow([r[h] for h in header])
-                            written += 1
-                            if written % 1000 == 0:
-                                print(f"[{datetime.utcnow().isoformat()}Z] Generated {written} rows...")
-                        text_stream.flush()
-                print(f"[{datetime.utcnow().isoformat()}Z] Successfully streamed CSV to {gcs_uri} (rows: {written})")
+                    # optionally compress on the fly (compresslevel=1 stays CPU-cheap)
+                    out_stream = gzip.GzipFile(fileobj=raw_stream, mode="wb", compresslevel=1) if gzip_encode else raw_stream
+                    if PYARROW_AVAILABLE:
+                        # columnar C++ writer: no per-row Python formatting
+                        table = pa.table(columns)
+                        pacsv.write_csv(table, out_stream,
+                                        write_options=pacsv.WriteOptions(include_header=True))
+                        if out_stream is not raw_stream:
+                            out_stream.close()
+                    else:
+                        # text wrapper so csv.writer writes strings; newline='' to avoid extra newlines
+                        with io.TextIOWrapper(out_stream, encoding="utf-8", newline="") as text_stream:
+                            writer = csv.writer(text_stream)
+                            writer.writerow(header)
+                            written = 0
+                            for r in zip(*columns.values()):
+                                writer.writerow(r)
+                                written += 1
+                                if written % progress_every == 0:
+                                    sys.stdout.write(f"[{datetime.utcnow().isoformat()}Z] Generated {written} rows...\n")
+                                    sys.stdout.flush()
+                            text_stream.flush()
+                print(f"[{datetime.utcnow().isoformat()}Z] Successfully streamed CSV to {gcs_uri} (rows: {n_rows})")
                 return gcs_uri
+            except NotFound:
+                raise RuntimeError(f"Bucket '{bucket_name}' not found or not accessible with current credentials.")
             except Exception as e:
                 attempt += 1
                 if attempt >= retries:
+                    # full traceback only on the final failure
+                    traceback.print_exc()
                     print(f"Streaming upload failed after {attempt} attempts: {e}", file=sys.stderr)
                     raise
                 wait = backoff ** attempt
-                print(f"Streaming upload failed (attempt {attempt}), retrying in {wait}s...", file=sys.stderr)
+                print(f"Streaming upload failed (attempt {attempt}): {type(e).__name__}: {e}; retrying in {wait}s...", file=sys.stderr)
                 time.sleep(wait)
 
     # Fallback: assemble CSV in memory and upload_from_string
     print("WARNING: Storage client does not support blob.open() — falling back to in-memory upload (may use significant memory).", file=sys.stderr)
     sio = io.StringIO()
     writer = csv.writer(sio, lineterminator="\n")
-    header = ["Loan_ID", "Cust_Name", "Loan_Amount", "Int_Rate", "Instalments", "Start_Date", "End_Date", "Status"]
     writer.writerow(header)
     written = 0
-    for r in rows_iter:
-        writer.writerow([r[h] for h in header])
+    for r in zip(*columns.values()):
+        writer.writerow(r)
         written += 1
-        if written % 1000 == 0:
-            print(f"[{datetime.utcnow().isoformat()}Z] Generated {written} rows...")
-    content = sio.getvalue()
+        if written % progress_every == 0:
+            sys.stdout.write(f"[{datetime.utcnow().isoformat()}Z] Generated {written} rows...\n")
+            sys.stdout.flush()
+    payload = sio.getvalue().encode("utf-8")
+    if gzip_encode:
+        payload = gzip.compress(payload, compresslevel=1)
     attempt = 0
     while attempt < retries:
         try:
-            blob.upload_from_string(content.encode("utf-8"), content_type="text/csv")
+            blob.upload_from_string(payload, content_type="text/csv")
             print(f"[{datetime.utcnow().isoformat()}Z] Successfully uploaded CSV to {gcs_uri} (rows: {written})")
             return gcs_uri
+        except NotFound:
+            raise RuntimeError(f"Bucket '{bucket_name}' not found or not accessible with current credentials.")
         except Exception:
             attempt += 1
             if attempt >= retries:
@@ -160,6 +239,12 @@ def parse_args(argv=None):
     p.add_argument("--dest", "-d", default=None, help="Destination object name in GCS (e.g. source_data/loans.csv). If omitted defaults to source_data/loans_<ts>.csv")
     p.add_argument("--seed", type=int, default=None, help="Random seed")
     p.add_argument("--retries", type=int, default=3, help="Upload retries for transient failures")
+    p.add_argument("--upload-chunk-size-mib", type=int, default=16,
+                   help="Resumable upload chunk size in MiB (256 KiB-aligned; default 16)")
+    p.add_argument("--progress-interval", type=int, default=PROGRESS_EVERY,
+                   help=f"Print a progress line every N rows (default {PROGRESS_EVERY})")
+    p.add_argument("--no-gzip", action="store_true",
+                   help="Disable gzip content-encoding for the uploaded CSV (default: gzip on)")
     return p.parse_args(argv)
 
 
@@ -169,13 +254,23 @@ def main(argv=None):
     ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
     default_name = f"loans.csv" # If needed with timestamp f"loans_{ts}.csv"
     dest = args.dest if args.dest else f"{DEFAULT_GCS_DEST_PREFIX}/{default_name}"
+    gzip_encode = not args.no_gzip
+    if gzip_encode and not dest.endswith(".gz"):
+        dest += ".gz"
 
     print(f"Generating {args.rows} rows and streaming to gs://{args.bucket}/{dest} ...")
 
-    rows_iter = generate_loans_rows(n_rows=args.rows, seed=args.seed)
+    columns = generate_loans_columns(n_rows=args.rows, seed=args.seed)
+
+    # For tiny payloads skip the large internal upload buffer entirely
+    chunk_size = args.upload_chunk_size_mib * 1024 * 1024
+    if args.rows * APPROX_ROW_BYTES < 1024 * 1024:
+        chunk_size = None
 
     try:
-        gcs_uri = stream_csv_to_gcs(args.bucket, dest, rows_iter, retries=args.retries)
+        gcs_uri = stream_csv_to_gcs(args.bucket, dest, columns, retries=args.retries,
+                                    chunk_size=chunk_size, progress_every=args.progress_interval,
+                                    gzip_encode=gzip_encode)
         print(f"Upload successful: {gcs_uri}")
     except Exception as e:
         print("Upload failed:", e, file=sys.stderr)